@@ -14,5 +14,39 @@ PyL2D是一个用于live2d的python库，用于live2d的核心包装。
 许可证：CC-BY-NC-SA 4.0
 """
 
+import importlib
+
 from .l2d import Live2DCubismCore
-__all__ = ['Live2DCubismCore']
\ No newline at end of file
+
+# 依赖NumPy等较重依赖的子模块在第一次访问时才导入，保持 `import PyL2D` 足够轻量。
+_lazy_attrs = {
+    'MocMetadata': '.l2dMeta',
+    'get_moc_metadata': '.l2dMeta',
+    'LogSink': '.l2dLog',
+    'install_log_sink': '.l2dLog',
+    'CompiledExpression': '.l2dBlend',
+    'CompiledPose': '.l2dBlend',
+    'ExpressionBlender': '.l2dBlend',
+    'load_moc': '.l2dLoader',
+    'new_model': '.l2dLoader',
+    'ParameterRecorder': '.l2dRecord',
+    'read_recording': '.l2dRecord',
+    'replay': '.l2dRecord',
+    'ModelGroup': '.l2dGroup',
+}
+
+def __getattr__(name: str):
+    module = _lazy_attrs.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attrs))
+
+__all__ = ['Live2DCubismCore', 'MocMetadata', 'get_moc_metadata', 'LogSink', 'install_log_sink',
+           'CompiledExpression', 'CompiledPose', 'ExpressionBlender',
+           'load_moc', 'new_model', 'ParameterRecorder', 'read_recording', 'replay',
+           'ModelGroup']
\ No newline at end of file
@@ -1,7 +1,9 @@
 """ Live2D Cubism Core dll 装饰器 """
 
 import ctypes
+import threading
 from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 from .PointerType import (
     CharPtrPtr,
     csmParameterTypePtr,
@@ -31,19 +33,51 @@ from .l2dData import (
 
 l2d_path = Path(__file__).parent / "bin" / "Live2DCubismCore.dll"
 
+# 进程内共享：每个dll路径只加载一次，函数在第一次调用时绑定。
+_libraries: Dict[str, Tuple[ctypes.CDLL, Dict[Tuple[Any, ...], Any]]] = {}
+_libraries_lock = threading.Lock()
+
+def _load_library(dll_path: str) -> Tuple[ctypes.CDLL, Dict[Tuple[Any, ...], Any]]:
+    """ Loads the dll once per process and returns it with its bound-function table. """
+    entry = _libraries.get(dll_path)
+    if entry is None:
+        with _libraries_lock:
+            entry = _libraries.get(dll_path)
+            if entry is None:
+                entry = _libraries[dll_path] = (ctypes.CDLL(dll_path, use_errno=True, use_last_error=True), {})
+    return entry
+
 class Live2DCubismCore:
-    """ Wrapper for the Live2D Cubism Core dll. """
+    """
+    Wrapper for the Live2D Cubism Core dll.
+    The dll is loaded lazily on first use and shared by every wrapper with the same path,
+    so an invalid `dll_path` raises OSError on the first call rather than in `__init__`.
+    """
     def __init__(self, dll_path: Path = l2d_path):
-        self.dll = ctypes.CDLL(str(dll_path if dll_path not in (None, '') else l2d_path) ,use_errno=True, use_last_error=True)
+        self.dll_path = str(dll_path if dll_path not in (None, '') else l2d_path)
+        self._functions: Optional[Dict[Tuple[Any, ...], Any]] = None
+
+    @property
+    def dll(self) -> ctypes.CDLL:
+        """ The shared dll handle, loaded on first access. """
+        return _load_library(self.dll_path)[0]
 
     def _define_function(self, name, restype, argtypes=[]):
-        func = getattr(self.dll, name)
-        func.restype = restype
-        func.argtypes = argtypes
+        functions = self._functions
+        if functions is None:
+            functions = self._functions = _load_library(self.dll_path)[1]
+        key = (name, restype, tuple(argtypes))
+        func = functions.get(key)
+        if func is None:
+            # dll[name] 每次返回新的函数对象，不同签名的绑定互不覆盖。
+            func = self.dll[name]
+            func.restype = restype
+            func.argtypes = argtypes
+            functions[key] = func
         return func
-    
+
     def call_func(self, name: str, restype, argtypes, *args):
-        """ Call a function from the dll. """
+        """ Call a function from the dll. Each (name, restype, argtypes) signature is bound once and then reused. """
         func = self._define_function(name, restype, argtypes)
         return func(*args)
 
@@ -0,0 +1,311 @@
+""" 表情(.exp3.json)与姿势(.pose3.json)混合：编译为参数表/部件表上的索引数组，每帧对 core 缓冲区做一次向量化写入。 """
+
+import json
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .l2d import Live2DCubismCore
+from .l2dMeta import MocMetadata
+from .PointerType import csmModelPtr
+
+# 与 Cubism Framework 保持一致的常量
+DEFAULT_EXPRESSION_FADE_TIME = 1.0
+DEFAULT_POSE_FADE_TIME = 0.5
+POSE_EPSILON = 0.001
+POSE_PHI = 0.5
+POSE_BACK_OPACITY_THRESHOLD = 0.15
+
+BLEND_ADD = 0
+BLEND_MULTIPLY = 1
+BLEND_OVERWRITE = 2
+_BLEND_NAMES = {"Add": BLEND_ADD, "Multiply": BLEND_MULTIPLY, "Overwrite": BLEND_OVERWRITE}
+
+
+def parameter_values_view(core: Live2DCubismCore, model: csmModelPtr, metadata: MocMetadata) -> np.ndarray:
+    """ Wraps `csmGetParameterValues` as a writable float32 view (no copy). """
+    return np.ctypeslib.as_array(core.csmGetParameterValues(model), shape=(metadata.parameter_count,))
+
+
+def part_opacities_view(core: Live2DCubismCore, model: csmModelPtr, metadata: MocMetadata) -> np.ndarray:
+    """ Wraps `csmGetPartOpacities` as a writable float32 view (no copy). """
+    return np.ctypeslib.as_array(core.csmGetPartOpacities(model), shape=(metadata.part_count,))
+
+
+def _ease_sine(t: float) -> float:
+    if t <= 0.0:
+        return 0.0
+    if t >= 1.0:
+        return 1.0
+    return 0.5 - 0.5 * math.cos(t * math.pi)
+
+
+def _read_json(source) -> dict:
+    if isinstance(source, dict):
+        return source
+    with open(source, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class CompiledExpression:
+    """
+    An expression compiled against one moc's parameter table.
+    `indices`/`values`/`blends` hold one entry per parameter the expression touches;
+    parameters missing from the moc are skipped.
+    """
+    __slots__ = ("name", "indices", "values", "blends", "fade_in", "fade_out")
+
+    def __init__(self, name: str, indices: np.ndarray, values: np.ndarray, blends: np.ndarray,
+                 fade_in: float, fade_out: float):
+        self.name = name
+        self.indices = indices
+        self.values = values
+        self.blends = blends
+        self.fade_in = fade_in
+        self.fade_out = fade_out
+
+    @classmethod
+    def compile(cls, source, metadata: MocMetadata, name: str = "") -> "CompiledExpression":
+        """
+        Compiles an expression.
+        - source: Path of a .exp3.json file or its parsed dict.
+        - metadata: Metadata of the target moc.
+        """
+        data = _read_json(source)
+        indices, values, blends = [], [], []
+        for entry in data.get("Parameters", []):
+            index = metadata.index_of("parameter", entry["Id"])
+            if index < 0:
+                continue
+            blend = entry.get("Blend", "Add")
+            if blend not in _BLEND_NAMES:
+                raise ValueError(f"Unknown expression blend {blend!r} for {entry['Id']!r}")
+            indices.append(index)
+            values.append(entry.get("Value", 0.0))
+            blends.append(_BLEND_NAMES[blend])
+        return cls(
+            name or ("" if isinstance(source, dict) else str(source)),
+            np.asarray(indices, dtype=np.intp),
+            np.asarray(values, dtype=np.float32),
+            np.asarray(blends, dtype=np.int8),
+            float(data.get("FadeInTime", DEFAULT_EXPRESSION_FADE_TIME)),
+            float(data.get("FadeOutTime", DEFAULT_EXPRESSION_FADE_TIME)),
+        )
+
+
+class ExpressionBlender:
+    """
+    Applies the active expressions to a parameter buffer.
+    Per parameter: `(overwrite + additive) * multiply`, where additive sums `value * weight`,
+    multiply takes the product of `1 + (value - 1) * weight` and overwrite lerps from the
+    current value towards each expression's value in activation order.
+    """
+
+    def __init__(self, metadata: MocMetadata):
+        self.metadata = metadata
+        self._active: List[list] = []  # [expression, elapsed, fade_out_elapsed or None]
+        self._layout: Optional[tuple] = None
+
+    def activate(self, expression: CompiledExpression, exclusive: bool = False) -> None:
+        """
+        Starts fading an expression in.
+        - exclusive: Fade out every other active expression, like the framework's expression manager.
+        """
+        if exclusive:
+            for entry in self._active:
+                if entry[2] is None:
+                    entry[2] = 0.0
+        for entry in self._active:
+            if entry[0] is expression and entry[2] is None:
+                return
+        self._active.append([expression, 0.0, None])
+        self._layout = None
+
+    def deactivate(self, expression: Optional[CompiledExpression] = None) -> None:
+        """ Starts fading out `expression`, or every active expression if None. """
+        for entry in self._active:
+            if (expression is None or entry[0] is expression) and entry[2] is None:
+                entry[2] = 0.0
+
+    @property
+    def active(self) -> Tuple[CompiledExpression, ...]:
+        return tuple(entry[0] for entry in self._active)
+
+    def update(self, delta_time: float) -> None:
+        """ Advances the fades; expressions that finished fading out are dropped. """
+        delta_time = max(delta_time, 0.0)
+        kept = []
+        for entry in self._active:
+            entry[1] += delta_time
+            if entry[2] is not None:
+                entry[2] += delta_time
+                if entry[2] >= entry[0].fade_out:
+                    continue
+            kept.append(entry)
+        if len(kept) != len(self._active):
+            self._active = kept
+            self._layout = None
+
+    def weights(self) -> np.ndarray:
+        """ Current fade weight of each active expression, in activation order. """
+        out = np.empty(len(self._active), dtype=np.float32)
+        for i, (expression, elapsed, fading_out) in enumerate(self._active):
+            weight = _ease_sine(elapsed / expression.fade_in) if expression.fade_in > 0.0 else 1.0
+            if fading_out is not None:
+                weight *= 1.0 - (_ease_sine(fading_out / expression.fade_out) if expression.fade_out > 0.0 else 1.0)
+            out[i] = weight
+        return out
+
+    def _build_layout(self) -> tuple:
+        # 活动集合变化时才重建：把各表情的索引/值铺成 (表情数 × 受影响参数数) 的稠密矩阵。
+        expressions = [entry[0] for entry in self._active]
+        columns = np.unique(np.concatenate([e.indices for e in expressions])) if expressions else np.empty(0, np.intp)
+        shape = (len(expressions), len(columns))
+        additive = np.zeros(shape, dtype=np.float32)
+        multiply = np.ones(shape, dtype=np.float32)
+        overwrite = np.zeros(shape, dtype=np.float32)
+        overwrite_mask = np.zeros(shape, dtype=np.float32)
+        for row, e in enumerate(expressions):
+            cols = np.searchsorted(columns, e.indices)
+            for blend, target in ((BLEND_ADD, additive), (BLEND_MULTIPLY, multiply), (BLEND_OVERWRITE, overwrite)):
+                selected = e.blends == blend
+                target[row, cols[selected]] = e.values[selected]
+            overwrite_mask[row, cols[e.blends == BLEND_OVERWRITE]] = 1.0
+        minimum = self.metadata.parameter_minimum_values[columns]
+        maximum = self.metadata.parameter_maximum_values[columns]
+        return columns, additive, multiply - 1.0, overwrite, overwrite_mask, minimum, maximum
+
+    def apply(self, parameter_values: np.ndarray) -> None:
+        """
+        Blends the active expressions into `parameter_values` in place.
+        - parameter_values: Parameter buffer, e.g. from `parameter_values_view()`.
+        """
+        if not self._active:
+            return
+        if self._layout is None:
+            self._layout = self._build_layout()
+        columns, additive, multiply_delta, overwrite, overwrite_mask, minimum, maximum = self._layout
+        if len(columns) == 0:
+            return
+        w = self.weights()[:, None]
+        alpha = overwrite_mask * w
+        keep = 1.0 - alpha
+        # 覆盖混合是按激活顺序的逐次插值，其闭式为 cur * Π(1-α) + Σ_e O_e α_e Π_{k>e}(1-α_k)
+        later_keep = np.ones_like(keep)
+        if len(keep) > 1:
+            later_keep[:-1] = np.cumprod(keep[:0:-1], axis=0)[::-1]
+        current = parameter_values[columns]
+        result = current * np.prod(keep, axis=0) + np.sum(overwrite * alpha * later_keep, axis=0)
+        result += np.sum(additive * w, axis=0)
+        result *= np.prod(1.0 + multiply_delta * w, axis=0)
+        parameter_values[columns] = np.clip(result, minimum, maximum)
+
+
+class CompiledPose:
+    """
+    A pose compiled against one moc's part table.
+    Parts of all groups are flattened into `part_indices` (group `g` spans
+    `group_starts[g]:group_starts[g + 1]`); `parameter_indices` holds the parameter
+    sharing each part's ID, or -1. Links are resolved into `link_sources`/`link_targets`.
+    """
+    __slots__ = ("part_indices", "parameter_indices", "group_ids", "group_starts",
+                 "link_sources", "link_targets", "fade_time")
+
+    def __init__(self, part_indices: np.ndarray, parameter_indices: np.ndarray, group_starts: np.ndarray,
+                 link_sources: np.ndarray, link_targets: np.ndarray, fade_time: float):
+        self.part_indices = part_indices
+        self.parameter_indices = parameter_indices
+        self.group_starts = group_starts
+        self.group_ids = np.repeat(np.arange(len(group_starts) - 1), np.diff(group_starts))
+        self.link_sources = link_sources
+        self.link_targets = link_targets
+        self.fade_time = fade_time
+
+    @classmethod
+    def compile(cls, source, metadata: MocMetadata) -> "CompiledPose":
+        """
+        Compiles a pose.
+        - source: Path of a .pose3.json file or its parsed dict.
+        - metadata: Metadata of the target moc.
+        """
+        data = _read_json(source)
+        parts: List[int] = []
+        parameters: List[int] = []
+        starts = [0]
+        link_sources: List[int] = []
+        link_targets: List[int] = []
+        for group in data.get("Groups", []):
+            for entry in group:
+                part = metadata.index_of("part", entry["Id"])
+                if part < 0:
+                    continue
+                parts.append(part)
+                parameters.append(metadata.index_of("parameter", entry["Id"]))
+                for link_id in entry.get("Link", []):
+                    link = metadata.index_of("part", link_id)
+                    if link >= 0:
+                        link_sources.append(part)
+                        link_targets.append(link)
+            if len(parts) > starts[-1]:
+                starts.append(len(parts))
+        fade_time = float(data.get("FadeInTime", DEFAULT_POSE_FADE_TIME))
+        return cls(
+            np.asarray(parts, dtype=np.intp),
+            np.asarray(parameters, dtype=np.intp),
+            np.asarray(starts, dtype=np.intp),
+            np.asarray(link_sources, dtype=np.intp),
+            np.asarray(link_targets, dtype=np.intp),
+            fade_time if fade_time >= 0.0 else DEFAULT_POSE_FADE_TIME,
+        )
+
+    def reset(self, parameter_values: np.ndarray, part_opacities: np.ndarray) -> None:
+        """ Makes the first part of every group fully visible and hides the others. """
+        first = np.zeros(len(self.part_indices), dtype=bool)
+        first[self.group_starts[:-1]] = True
+        part_opacities[self.part_indices] = first
+        has_parameter = self.parameter_indices >= 0
+        parameter_values[self.parameter_indices[has_parameter]] = first[has_parameter]
+        self._copy_links(part_opacities)
+
+    def apply(self, parameter_values: np.ndarray, part_opacities: np.ndarray, delta_time: float) -> None:
+        """
+        Crossfades part visibility for every group in one pass.
+        - parameter_values: Parameter buffer; the part whose parameter is non-zero is shown.
+        - part_opacities: Part opacity buffer, e.g. from `part_opacities_view()`.
+        - delta_time: Seconds since the last call.
+        """
+        count = len(self.part_indices)
+        if count == 0:
+            return
+        delta_time = max(delta_time, 0.0)
+        has_parameter = self.parameter_indices >= 0
+        visible = np.zeros(count, dtype=bool)
+        visible[has_parameter] = parameter_values[self.parameter_indices[has_parameter]] > POSE_EPSILON
+        # 每组第一个可见部件；都不可见时取组内第一个。
+        positions = np.arange(count)
+        first_visible = np.minimum.reduceat(np.where(visible, positions, count), self.group_starts[:-1])
+        shown = np.where(first_visible < count, first_visible, self.group_starts[:-1])
+
+        opacities = part_opacities[self.part_indices]
+        # 有可见参数的组淡入；没有时回退到第一个部件并直接完全显示（与 DoFade 一致）。
+        if self.fade_time == 0.0:
+            faded = 1.0
+        else:
+            faded = np.minimum(opacities[shown] + delta_time / self.fade_time, 1.0)
+        new_opacity = np.where(first_visible < count, faded, 1.0).astype(np.float32)
+
+        n = new_opacity[self.group_ids]
+        a1 = np.where(n < POSE_PHI, n * (POSE_PHI - 1.0) / POSE_PHI + 1.0, (1.0 - n) * POSE_PHI / (1.0 - POSE_PHI))
+        back_opacity = (1.0 - a1) * (1.0 - n)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a1 = np.where(back_opacity > POSE_BACK_OPACITY_THRESHOLD,
+                          1.0 - POSE_BACK_OPACITY_THRESHOLD / (1.0 - n), a1)
+        opacities = np.minimum(opacities, a1)
+        opacities[shown] = new_opacity
+        part_opacities[self.part_indices] = opacities
+        self._copy_links(part_opacities)
+
+    def _copy_links(self, part_opacities: np.ndarray) -> None:
+        if len(self.link_targets):
+            part_opacities[self.link_targets] = part_opacities[self.link_sources]
@@ -0,0 +1,135 @@
+""" 同一moc的多模型批量接口：所有实例放在一块连续内存里，参数/透明度/渲染顺序/顶点以 (模型数 × …) 矩阵一次读写。 """
+
+import ctypes
+from typing import List, Optional
+
+import numpy as np
+
+from .l2d import Live2DCubismCore
+from .l2dData import csmAlignofModel
+from .l2dLoader import MocHandle, _aligned_buffer
+from .l2dMeta import MocMetadata, get_moc_metadata
+from .PointerType import csmModelPtr
+
+
+class ModelGroup:
+    """
+    A group of model instances sharing one moc.
+    Instances are laid out row by row in one aligned block, so every dynamic core buffer
+    (parameter values, part/drawable opacities, render orders, vertex positions) sits at the
+    same offset in every row. Scatter and gather are then single strided NumPy operations
+    over a (models, words) view of the block instead of per-model loops.
+    """
+
+    def __init__(self, core: Live2DCubismCore, moc: MocHandle, count: int, vertex_positions: bool = False):
+        """
+        - core: Core wrapper.
+        - moc: Revived moc from `load_moc()`; kept alive by the group.
+        - count: Number of instances.
+        - vertex_positions: Also gather vertex positions in `gather()`.
+        """
+        if count <= 0:
+            raise ValueError("count must be positive")
+        self.core = core
+        self.moc = moc
+        self.count = count
+        size = core.csmGetSizeofModel(moc.moc)
+        if size == 0:
+            raise RuntimeError(f"Failed to get model size: {core.get_error()}")
+        stride = -(-size // csmAlignofModel) * csmAlignofModel
+        self._block = _aligned_buffer(count * stride, csmAlignofModel).reshape(count, stride)
+        self.models: List[csmModelPtr] = []
+        for row in self._block:
+            model = core.csmInitializeModelInPlace(moc.moc, ctypes.c_void_p(row.ctypes.data), size)
+            if not model:
+                raise RuntimeError(f"Failed to initialize model: {core.get_error()}")
+            self.models.append(model)
+        self.metadata: MocMetadata = get_moc_metadata(core, moc, self.models[0])
+        self._floats = self._block.view(np.float32)
+        self._ints = self._block.view(np.int32)
+
+        meta = self.metadata
+        # 以 4 字节字为单位的偏移；所有实例必须一致，否则无法按列批量读写。
+        self._parameter_offset = self._word_offset(core.csmGetParameterValues, meta.parameter_count)
+        self._part_opacity_offset = self._word_offset(core.csmGetPartOpacities, meta.part_count)
+        self._drawable_opacity_offset = self._word_offset(core.csmGetDrawableOpacities, meta.drawable_count)
+        self._render_order_offset = self._word_offset(core.csmGetDrawableRenderOrders, meta.drawable_count)
+        self._vertex_columns: Optional[np.ndarray] = self._vertex_position_columns() if vertex_positions else None
+
+        self.parameters = self._floats[:, self._parameter_offset:self._parameter_offset + meta.parameter_count]
+        self.part_opacities = self._floats[:, self._part_opacity_offset:self._part_opacity_offset + meta.part_count]
+        self.drawable_opacities = np.empty((count, meta.drawable_count), dtype=np.float32)
+        self.render_orders = np.empty((count, meta.drawable_count), dtype=np.int32)
+        self.vertex_positions = (np.empty((count, int(meta.drawable_vertex_counts.sum()), 2), dtype=np.float32)
+                                 if vertex_positions else None)
+
+    def _row_word_offset(self, row: int, address: int) -> int:
+        base = self._block[row].ctypes.data
+        offset = address - base
+        if offset < 0 or offset >= self._block.shape[1] or offset % 4:
+            raise RuntimeError("Core buffer is not inside the model memory; batched access is not possible")
+        return offset // 4
+
+    def _word_offset(self, getter, length: int) -> int:
+        if length == 0:
+            return 0
+        offsets = set()
+        for row, model in enumerate(self.models):
+            offsets.add(self._row_word_offset(row, ctypes.cast(getter(model), ctypes.c_void_p).value))
+        if len(offsets) != 1:
+            raise RuntimeError("Model instances do not share one memory layout")
+        return offsets.pop()
+
+    def _vertex_position_columns(self) -> np.ndarray:
+        counts = self.metadata.drawable_vertex_counts
+        columns = None
+        for row, model in enumerate(self.models):
+            table = self.core.csmGetDrawableVertexPositions(model)
+            ranges = []
+            for i, n in enumerate(counts.tolist()):
+                if n == 0:
+                    continue
+                start = self._row_word_offset(row, ctypes.cast(table[i], ctypes.c_void_p).value)
+                ranges.append(np.arange(start, start + 2 * n, dtype=np.intp))
+            row_columns = np.concatenate(ranges) if ranges else np.empty(0, dtype=np.intp)
+            if columns is None:
+                columns = row_columns
+            elif not np.array_equal(columns, row_columns):
+                raise RuntimeError("Model instances do not share one memory layout")
+        return columns
+
+    def set_parameters(self, values: np.ndarray) -> None:
+        """
+        Scatters a (models, parameters) matrix into every instance's parameter buffer.
+        - values: 2-D array; row `i` goes to `models[i]`.
+        """
+        if values.shape != self.parameters.shape:
+            raise ValueError(f"expected shape {self.parameters.shape}, got {values.shape}")
+        self.parameters[...] = values
+
+    def update(self) -> None:
+        """ Calls `csmUpdateModel` on every instance. """
+        update = self.core.csmUpdateModel
+        for model in self.models:
+            update(model)
+
+    def gather(self) -> None:
+        """
+        Copies drawable opacities, render orders and (if enabled) vertex positions of every
+        instance into the preallocated `drawable_opacities`, `render_orders` and
+        `vertex_positions` arrays. `parameters` and `part_opacities` are live views and need no gather.
+        """
+        drawable_count = self.metadata.drawable_count
+        o = self._drawable_opacity_offset
+        np.copyto(self.drawable_opacities, self._floats[:, o:o + drawable_count])
+        o = self._render_order_offset
+        np.copyto(self.render_orders, self._ints[:, o:o + drawable_count])
+        if self._vertex_columns is not None:
+            np.take(self._floats, self._vertex_columns, axis=1, out=self.vertex_positions.reshape(self.count, -1))
+
+    def step(self, values: Optional[np.ndarray] = None) -> None:
+        """ One frame for the whole group: optional `set_parameters()`, then `update()` and `gather()`. """
+        if values is not None:
+            self.set_parameters(values)
+        self.update()
+        self.gather()
@@ -0,0 +1,74 @@
+""" moc与模型实例加载：按 csmAlignofMoc / csmAlignofModel 对齐分配内存，并让内存与指针同生命周期。 """
+
+import ctypes
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+from .l2d import Live2DCubismCore
+from .l2dData import csmAlignofMoc, csmAlignofModel
+from .PointerType import csmMocPtr, csmModelPtr
+
+
+def _aligned_buffer(size: int, alignment: int) -> np.ndarray:
+    raw = np.zeros(size + alignment, dtype=np.uint8)
+    offset = (-raw.ctypes.data) % alignment
+    return raw[offset:offset + size]  # 视图持有 raw 的引用
+
+
+class MocHandle:
+    """
+    A revived moc together with the aligned memory it lives in.
+    `metadata` caches the moc's `MocMetadata` once `get_moc_metadata()` has extracted it.
+    """
+    __slots__ = ("buffer", "moc", "size", "metadata")
+
+    def __init__(self, buffer: np.ndarray, moc: csmMocPtr):
+        self.buffer = buffer
+        self.moc = moc
+        self.size = len(buffer)
+        self.metadata = None
+
+
+class ModelHandle:
+    """ A model instance together with its aligned memory and the moc it was created from. """
+    __slots__ = ("buffer", "model", "moc")
+
+    def __init__(self, buffer: np.ndarray, model: csmModelPtr, moc: MocHandle):
+        self.buffer = buffer
+        self.model = model
+        self.moc = moc
+
+
+def load_moc(core: Live2DCubismCore, source: Union[str, Path, bytes]) -> MocHandle:
+    """
+    Copies a moc into aligned memory, checks it and revives it in place.
+    - source: Path of a .moc3 file or its bytes.
+    - return: Handle keeping the moc memory alive.
+    """
+    data = source if isinstance(source, (bytes, bytearray)) else Path(source).read_bytes()
+    buffer = _aligned_buffer(len(data), csmAlignofMoc)
+    buffer[:] = np.frombuffer(data, dtype=np.uint8)
+    address = ctypes.c_void_p(buffer.ctypes.data)
+    if not core.csmHasMocConsistency(address, len(data)):
+        raise ValueError("Moc data is inconsistent or invalid.")
+    moc = core.csmReviveMocInPlace(address, len(data))
+    if not moc:
+        raise RuntimeError(f"Failed to revive Moc: {core.get_error()}")
+    return MocHandle(buffer, moc)
+
+
+def new_model(core: Live2DCubismCore, moc: MocHandle) -> ModelHandle:
+    """
+    Instantiates a model from a revived moc in aligned memory.
+    - return: Handle keeping the model memory (and its moc) alive.
+    """
+    size = core.csmGetSizeofModel(moc.moc)
+    if size == 0:
+        raise RuntimeError(f"Failed to get model size: {core.get_error()}")
+    buffer = _aligned_buffer(size, csmAlignofModel)
+    model = core.csmInitializeModelInPlace(moc.moc, ctypes.c_void_p(buffer.ctypes.data), size)
+    if not model:
+        raise RuntimeError(f"Failed to initialize model: {core.get_error()}")
+    return ModelHandle(buffer, model, moc)
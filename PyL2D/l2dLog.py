@@ -0,0 +1,115 @@
+""" csmSetLogFunction 日志收集：回调只把消息放进有界环形缓冲区，由后台线程或手动调用转发到 logging。 """
+
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+from .l2d import Live2DCubismCore
+from .l2dData import csmLogFunction
+
+logger = logging.getLogger("PyL2D.core")
+
+# 所有安装过的回调都保存在这里，直到进程结束：core 持有的是裸函数指针，
+# 回调对象一旦被回收，core 再次打日志就会让进程崩溃。
+_callbacks: List[csmLogFunction] = []  # type: ignore
+_sinks: Dict[str, "LogSink"] = {}
+_sinks_lock = threading.Lock()
+
+
+class LogSink:
+    """
+    Bounded buffer for core log messages.
+    The core-side callback only appends the raw bytes (no decoding, no I/O, no locks);
+    when the buffer is full the new message is dropped and counted.
+    """
+
+    def __init__(self, capacity: int = 1024, target: Optional[logging.Logger] = None, level: int = logging.INFO):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.target = target if target is not None else logger
+        self.level = level
+        self.received = 0
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._buffer: deque = deque()
+        self._drain_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.callback = csmLogFunction(self._on_log)
+
+    def _on_log(self, message: bytes) -> None:
+        # 在 core 调用栈内执行，必须尽可能短。
+        self.received += 1
+        if len(self._buffer) >= self.capacity:
+            self.dropped += 1
+            return
+        self._buffer.append(message)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def drain(self, max_messages: Optional[int] = None) -> int:
+        """
+        Forwards buffered messages to the target logger.
+        - max_messages: Upper bound of messages to forward; all buffered messages if None.
+        - return: Number of messages forwarded.
+        """
+        forwarded = 0
+        with self._drain_lock:
+            buffer = self._buffer
+            while buffer and (max_messages is None or forwarded < max_messages):
+                message = buffer.popleft()
+                self.target.log(self.level, "%s", message.decode("utf-8", "replace").rstrip("\n"))
+                forwarded += 1
+            dropped = self.dropped
+            if dropped != self._reported_dropped:
+                self.target.warning("Dropped %d core log message(s): buffer full", dropped - self._reported_dropped)
+                self._reported_dropped = dropped
+        return forwarded
+
+    def start(self, interval: float = 0.1) -> None:
+        """ Starts a daemon thread that drains the buffer every `interval` seconds. """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="PyL2D-log-sink", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """ Stops the drain thread and forwards whatever is still buffered. """
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+            self._thread = None
+        self.drain()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.drain()
+
+
+def install_log_sink(core: Live2DCubismCore, capacity: int = 1024, target: Optional[logging.Logger] = None,
+                     level: int = logging.INFO, background: bool = True, interval: float = 0.1) -> LogSink:
+    """
+    Installs a managed log sink as the core log function.
+    The sink is shared by every wrapper of the same dll; installing again returns the existing sink,
+    and raises ValueError if `capacity`, `target` or `level` differ from it.
+    - core: Core wrapper whose dll receives the log function.
+    - background: Start the drain thread; otherwise call `drain()` yourself.
+    - return: The installed sink.
+    """
+    with _sinks_lock:
+        sink = _sinks.get(core.dll_path)
+        if sink is None:
+            sink = LogSink(capacity, target, level)
+            _callbacks.append(sink.callback)
+            core.csmSetLogFunction(sink.callback)
+            _sinks[core.dll_path] = sink
+        elif (sink.capacity, sink.target, sink.level) != (capacity, target if target is not None else logger, level):
+            raise ValueError(f"A log sink with different settings is already installed for {core.dll_path}")
+    if background:
+        sink.start(interval)
+    return sink
@@ -0,0 +1,274 @@
+""" moc静态元数据：每个moc只提取一次，由所有模型实例共享，可序列化为可mmap的扁平二进制文件。"""
+
+import ctypes
+import json
+import mmap
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .l2d import Live2DCubismCore
+from .l2dLoader import MocHandle
+from .PointerType import csmModelPtr
+
+_MAGIC = b"L2DMETA1"
+_HEADER = struct.Struct("<8sI")
+_ALIGN = 64
+
+# (字段名, dtype) —— 序列化文件中的数组顺序与此一致。
+# 变长数据按 CSR 方式存储：*_offsets 长度为 count + 1，切片 [offsets[i]:offsets[i + 1]] 即第 i 项。
+_ARRAY_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("parameter_id_blob", "u1"),
+    ("parameter_id_offsets", "<i8"),
+    ("parameter_types", "<i4"),
+    ("parameter_minimum_values", "<f4"),
+    ("parameter_maximum_values", "<f4"),
+    ("parameter_default_values", "<f4"),
+    ("parameter_key_counts", "<i4"),
+    ("parameter_key_offsets", "<i8"),
+    ("parameter_key_values", "<f4"),
+    ("part_id_blob", "u1"),
+    ("part_id_offsets", "<i8"),
+    ("part_parent_part_indices", "<i4"),
+    ("drawable_id_blob", "u1"),
+    ("drawable_id_offsets", "<i8"),
+    ("drawable_constant_flags", "u1"),
+    ("drawable_texture_indices", "<i4"),
+    ("drawable_parent_part_indices", "<i4"),
+    ("drawable_mask_counts", "<i4"),
+    ("drawable_mask_offsets", "<i8"),
+    ("drawable_masks", "<i4"),
+    ("drawable_vertex_counts", "<i4"),
+    ("drawable_vertex_offsets", "<i8"),
+    ("drawable_vertex_uvs", "<f4"),
+    ("drawable_index_counts", "<i4"),
+    ("drawable_index_offsets", "<i8"),
+    ("drawable_indices", "<u2"),
+)
+_ARRAY_NAMES = tuple(name for name, _ in _ARRAY_FIELDS)
+
+
+def _offsets(counts: np.ndarray) -> np.ndarray:
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def _pack_ids(ids_ptr, count: int) -> Tuple[np.ndarray, np.ndarray]:
+    ids = [ids_ptr[i] for i in range(count)]
+    offsets = _offsets(np.fromiter((len(s) for s in ids), dtype=np.int64, count=count))
+    return np.frombuffer(b"".join(ids), dtype=np.uint8).copy(), offsets
+
+
+def _copy(ptr, count: int, dtype: str) -> np.ndarray:
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.ctypeslib.as_array(ptr, shape=(count,)).astype(dtype, copy=True)
+
+
+def _copy_ragged(ptr_ptr, counts: np.ndarray, elem_type, width: int, dtype: str) -> np.ndarray:
+    """ Concatenates a per-item pointer table (e.g. `const float**`) into one contiguous array. """
+    out = np.empty(int(counts.sum()) * width, dtype=dtype)
+    pos = 0
+    for i, n in enumerate(counts.tolist()):
+        if n == 0:
+            continue
+        src = ctypes.cast(ptr_ptr[i], ctypes.POINTER(elem_type))
+        out[pos:pos + n * width] = np.ctypeslib.as_array(src, shape=(n * width,))
+        pos += n * width
+    return out
+
+
+def _decode_ids(blob: np.ndarray, offsets: np.ndarray) -> Tuple[str, ...]:
+    raw = blob.tobytes()
+    bounds = offsets.tolist()
+    return tuple(raw[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(bounds) - 1))
+
+
+class MocMetadata:
+    """
+    Immutable, array-backed static metadata of a moc.
+    Every array is contiguous and read-only; ragged per-item data (key values, masks, UVs, indices)
+    is stored as one flat array plus an `*_offsets` array of length `count + 1`.
+    """
+    __slots__ = _ARRAY_NAMES + ("_buffer", "_ids", "_index")
+
+    def __init__(self, arrays: Dict[str, np.ndarray], buffer: Optional[mmap.mmap] = None):
+        for name, dtype in _ARRAY_FIELDS:
+            array = np.ascontiguousarray(arrays[name], dtype=dtype)
+            array.flags.writeable = False
+            object.__setattr__(self, name, array)
+        object.__setattr__(self, "_buffer", buffer)
+        object.__setattr__(self, "_ids", {})
+        object.__setattr__(self, "_index", {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        raise TypeError(f"{type(self).__name__} is shared through save()/load(), not pickle")
+
+    @classmethod
+    def from_model(cls, core: Live2DCubismCore, model: csmModelPtr) -> "MocMetadata":
+        """
+        Extracts the static metadata of the moc backing `model`.
+        - core: Core wrapper used to query the model.
+        - model: Any initialized instance of the moc.
+        - return: New metadata object.
+        """
+        parameter_count = core.csmGetParameterCount(model)
+        part_count = core.csmGetPartCount(model)
+        drawable_count = core.csmGetDrawableCount(model)
+        if min(parameter_count, part_count, drawable_count) < 0:
+            raise RuntimeError(f"Failed to query model counts: {core.get_error()}")
+
+        a: Dict[str, np.ndarray] = {}
+        a["parameter_id_blob"], a["parameter_id_offsets"] = _pack_ids(core.csmGetParameterIds(model), parameter_count)
+        a["parameter_types"] = _copy(core.csmGetParameterTypes(model), parameter_count, "<i4")
+        a["parameter_minimum_values"] = _copy(core.csmGetParameterMinimumValues(model), parameter_count, "<f4")
+        a["parameter_maximum_values"] = _copy(core.csmGetParameterMaximumValues(model), parameter_count, "<f4")
+        a["parameter_default_values"] = _copy(core.csmGetParameterDefaultValues(model), parameter_count, "<f4")
+        key_counts = _copy(core.csmGetParameterKeyCounts(model), parameter_count, "<i4")
+        a["parameter_key_counts"] = key_counts
+        a["parameter_key_offsets"] = _offsets(key_counts)
+        a["parameter_key_values"] = _copy_ragged(core.csmGetParameterKeyValues(model), key_counts, ctypes.c_float, 1, "<f4")
+
+        a["part_id_blob"], a["part_id_offsets"] = _pack_ids(core.csmGetPartIds(model), part_count)
+        a["part_parent_part_indices"] = _copy(core.csmGetPartParentPartIndices(model), part_count, "<i4")
+
+        a["drawable_id_blob"], a["drawable_id_offsets"] = _pack_ids(core.csmGetDrawableIds(model), drawable_count)
+        a["drawable_constant_flags"] = _copy(core.csmGetDrawableConstantFlags(model), drawable_count, "u1")
+        a["drawable_texture_indices"] = _copy(core.csmGetDrawableTextureIndices(model), drawable_count, "<i4")
+        a["drawable_parent_part_indices"] = _copy(core.csmGetDrawableParentPartIndices(model), drawable_count, "<i4")
+        mask_counts = _copy(core.csmGetDrawableMaskCounts(model), drawable_count, "<i4")
+        a["drawable_mask_counts"] = mask_counts
+        a["drawable_mask_offsets"] = _offsets(mask_counts)
+        a["drawable_masks"] = _copy_ragged(core.csmGetDrawableMasks(model), mask_counts, ctypes.c_int, 1, "<i4")
+        vertex_counts = _copy(core.csmGetDrawableVertexCounts(model), drawable_count, "<i4")
+        a["drawable_vertex_counts"] = vertex_counts
+        a["drawable_vertex_offsets"] = _offsets(vertex_counts)
+        a["drawable_vertex_uvs"] = _copy_ragged(core.csmGetDrawableVertexUvs(model), vertex_counts, ctypes.c_float, 2, "<f4").reshape(-1, 2)
+        index_counts = _copy(core.csmGetDrawableIndexCounts(model), drawable_count, "<i4")
+        a["drawable_index_counts"] = index_counts
+        a["drawable_index_offsets"] = _offsets(index_counts)
+        a["drawable_indices"] = _copy_ragged(core.csmGetDrawableIndices(model), index_counts, ctypes.c_ushort, 1, "<u2")
+        return cls(a)
+
+    @property
+    def parameter_count(self) -> int:
+        return len(self.parameter_types)
+
+    @property
+    def part_count(self) -> int:
+        return len(self.part_parent_part_indices)
+
+    @property
+    def drawable_count(self) -> int:
+        return len(self.drawable_constant_flags)
+
+    def _id_table(self, kind: str) -> Tuple[str, ...]:
+        ids = self._ids.get(kind)
+        if ids is None:
+            ids = _decode_ids(getattr(self, f"{kind}_id_blob"), getattr(self, f"{kind}_id_offsets"))
+            self._ids[kind] = ids
+        return ids
+
+    @property
+    def parameter_ids(self) -> Tuple[str, ...]:
+        return self._id_table("parameter")
+
+    @property
+    def part_ids(self) -> Tuple[str, ...]:
+        return self._id_table("part")
+
+    @property
+    def drawable_ids(self) -> Tuple[str, ...]:
+        return self._id_table("drawable")
+
+    def index_of(self, kind: str, id_: str) -> int:
+        """
+        Looks up the index of an ID.
+        - kind: 'parameter', 'part' or 'drawable'.
+        - id_: ID to look up.
+        - return: Index of the ID; '-1' if not found.
+        """
+        index = self._index.get(kind)
+        if index is None:
+            index = {name: i for i, name in enumerate(self._id_table(kind))}
+            self._index[kind] = index
+        return index.get(id_, -1)
+
+    def parameter_keys(self, index: int) -> np.ndarray:
+        """ Gets the key values of a parameter (read-only view). """
+        return self.parameter_key_values[self.parameter_key_offsets[index]:self.parameter_key_offsets[index + 1]]
+
+    def drawable_mask(self, index: int) -> np.ndarray:
+        """ Gets the mask drawable indices of a drawable (read-only view). """
+        return self.drawable_masks[self.drawable_mask_offsets[index]:self.drawable_mask_offsets[index + 1]]
+
+    def drawable_uvs(self, index: int) -> np.ndarray:
+        """ Gets the (vertex_count, 2) UVs of a drawable (read-only view). """
+        return self.drawable_vertex_uvs[self.drawable_vertex_offsets[index]:self.drawable_vertex_offsets[index + 1]]
+
+    def drawable_index_list(self, index: int) -> np.ndarray:
+        """ Gets the triangle indices of a drawable (read-only view). """
+        return self.drawable_indices[self.drawable_index_offsets[index]:self.drawable_index_offsets[index + 1]]
+
+    def save(self, path) -> None:
+        """
+        Writes the metadata to a flat binary file that `load()` can mmap.
+        Layout: magic, header length, JSON header, then each array aligned to 64 bytes.
+        """
+        entries = {}
+        offset = 0
+        for name in _ARRAY_NAMES:
+            array = getattr(self, name)
+            offset = -(-offset // _ALIGN) * _ALIGN
+            entries[name] = [array.dtype.str, list(array.shape), offset]
+            offset += array.nbytes
+        header = json.dumps({"arrays": entries}, separators=(",", ":")).encode("utf-8")
+        base = -(-(_HEADER.size + len(header)) // _ALIGN) * _ALIGN
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(header)))
+            f.write(header)
+            for name in _ARRAY_NAMES:
+                f.seek(base + entries[name][2])
+                f.write(getattr(self, name).tobytes())
+            f.truncate(base + offset)
+
+    @classmethod
+    def load(cls, path) -> "MocMetadata":
+        """
+        Maps a file written by `save()`. Arrays are zero-copy views of the mapping,
+        so every process loading the same file shares its pages.
+        """
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_size = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC:
+            buffer.close()
+            raise ValueError(f"{path} is not a moc metadata file")
+        header = json.loads(buffer[_HEADER.size:_HEADER.size + header_size].decode("utf-8"))
+        base = -(-(_HEADER.size + header_size) // _ALIGN) * _ALIGN
+        arrays = {}
+        for name, (dtype, shape, offset) in header["arrays"].items():
+            count = int(np.prod(shape, dtype=np.int64))
+            arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=base + offset).reshape(shape)
+        return cls(arrays, buffer)
+
+
+def get_moc_metadata(core: Live2DCubismCore, moc: MocHandle, model: csmModelPtr) -> MocMetadata:
+    """
+    Gets the metadata of `moc`, extracting it from `model` only the first time.
+    The metadata is stored on the handle, so it lives and dies with the moc memory.
+    - moc: Handle from `load_moc()`.
+    - model: Any instance initialized from `moc`.
+    """
+    metadata = moc.metadata
+    if metadata is None:
+        metadata = moc.metadata = MocMetadata.from_model(core, model)
+    return metadata
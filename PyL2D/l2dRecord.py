@@ -0,0 +1,304 @@
+""" 参数录制与回放：逐帧记录写入模型的参数/部件透明度，回放时尽可能快地驱动多个模型并统计吞吐与延迟。
+
+文件格式（小端，只追加）：
+    文件头  magic(8s) parameter_count(I) part_count(I) keyframe_interval(I)
+    每一帧  kind(B) timestamp(d) count(I) + 数据
+        关键帧  count 个 float32 完整向量（参数在前，部件透明度在后）
+        稀疏差分帧  count 个 uint32 下标 + count 个 uint32 差值
+        稠密差分帧  count 个 uint32 差值（count 等于向量宽度）；超过一半的值变化时使用，
+                    避免每个值 8 字节的稀疏编码比关键帧还大
+    差值是 float32 位模式与上一帧的按位异或，解码无损。
+"""
+
+import argparse
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .l2d import Live2DCubismCore
+from .l2dBlend import parameter_values_view, part_opacities_view
+from .l2dMeta import MocMetadata
+from .PointerType import csmModelPtr
+
+_MAGIC = b"L2DREC01"
+_FILE_HEADER = struct.Struct("<8sIII")
+_FRAME_HEADER = struct.Struct("<BdI")
+_KEYFRAME = 0
+_DELTA = 1
+_DENSE_DELTA = 2
+
+
+def _read_header(data: bytes, path) -> tuple:
+    """ Returns (parameter_count, part_count) of a recording; raises ValueError for other files. """
+    if len(data) < _FILE_HEADER.size:
+        raise ValueError(f"{path} is too short to be a recording file")
+    magic, parameter_count, part_count, _ = _FILE_HEADER.unpack_from(data, 0)
+    if magic != _MAGIC:
+        raise ValueError(f"{path} is not a recording file")
+    return parameter_count, part_count
+
+
+def _scan_frames(data: bytes, width: int, path) -> Iterator[Tuple[int, float, int, int, int]]:
+    """
+    Yields (kind, timestamp, count, payload_offset, end_offset) for every complete frame.
+    Stops silently at a truncated trailing frame; raises ValueError for a corrupt one.
+    """
+    have_keyframe = False
+    offset = _FILE_HEADER.size
+    while offset + _FRAME_HEADER.size <= len(data):
+        kind, timestamp, count = _FRAME_HEADER.unpack_from(data, offset)
+        corrupt = ValueError(f"{path}: corrupt frame at byte {offset}")
+        payload = offset + _FRAME_HEADER.size
+        if kind in (_KEYFRAME, _DENSE_DELTA):
+            if count != width:
+                raise corrupt
+            end = payload + 4 * count
+        elif kind == _DELTA:
+            if count > width:
+                raise corrupt
+            end = payload + 8 * count
+        else:
+            raise corrupt
+        if kind != _KEYFRAME and not have_keyframe:
+            raise corrupt
+        if end > len(data):
+            return
+        yield kind, timestamp, count, payload, end
+        have_keyframe = True
+        offset = end
+
+
+class ParameterRecorder:
+    """
+    Appends per-frame parameter and part-opacity vectors to a recording file.
+    Delta frames XOR the float32 bit patterns with the previous frame, so decoding
+    reproduces the recorded vectors bit for bit. When appending to an existing file, a
+    truncated trailing frame left by a crashed session is cut off first.
+    """
+
+    def __init__(self, path, metadata: MocMetadata, keyframe_interval: int = 60):
+        if keyframe_interval <= 0:
+            raise ValueError("keyframe_interval must be positive")
+        self.metadata = metadata
+        self.parameter_count = metadata.parameter_count
+        self.part_count = metadata.part_count
+        self.keyframe_interval = keyframe_interval
+        self.frames = 0
+        self._previous: Optional[np.ndarray] = None  # 上一帧的 uint32 位模式
+        self._since_keyframe = 0
+        self._start: Optional[float] = None
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(_FILE_HEADER.pack(_MAGIC, self.parameter_count, self.part_count, keyframe_interval))
+            return
+        try:
+            data = Path(path).read_bytes()
+            counts = _read_header(data, path)
+            if counts != (self.parameter_count, self.part_count):
+                raise ValueError(f"{path} is not a recording of this moc")
+            # 上次会话崩溃留下的残帧会让后续追加的帧全部无法解析，先截掉。
+            end = _FILE_HEADER.size
+            for *_, end in _scan_frames(data, sum(counts), path):
+                pass
+            if end < len(data):
+                self._file.truncate(end)
+        except BaseException:
+            self._file.close()
+            raise
+
+    def record(self, parameter_values: np.ndarray, part_opacities: np.ndarray, timestamp: Optional[float] = None) -> None:
+        """
+        Appends one frame.
+        - timestamp: Seconds since the first recorded frame; measured with perf_counter if None.
+        """
+        if len(parameter_values) != self.parameter_count or len(part_opacities) != self.part_count:
+            raise ValueError(
+                f"expected {self.parameter_count} parameters and {self.part_count} part opacities, "
+                f"got {len(parameter_values)} and {len(part_opacities)}")
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+        if timestamp is None:
+            timestamp = now - self._start
+        bits = np.concatenate((parameter_values, part_opacities)).astype("<f4").view("<u4")
+        write = self._file.write
+        if self._previous is None or self._since_keyframe >= self.keyframe_interval:
+            write(_FRAME_HEADER.pack(_KEYFRAME, timestamp, len(bits)))
+            write(bits.tobytes())
+            self._since_keyframe = 1
+        else:
+            delta = bits ^ self._previous
+            changed = np.flatnonzero(delta)
+            if len(changed) * 2 > len(bits):
+                write(_FRAME_HEADER.pack(_DENSE_DELTA, timestamp, len(bits)))
+                write(delta.tobytes())
+            else:
+                write(_FRAME_HEADER.pack(_DELTA, timestamp, len(changed)))
+                write(changed.astype("<u4").tobytes())
+                write(delta[changed].tobytes())
+            self._since_keyframe += 1
+        self._previous = bits
+        self.frames += 1
+
+    def capture(self, core: Live2DCubismCore, model: csmModelPtr, timestamp: Optional[float] = None) -> None:
+        """ Records the values currently in the model's parameter and part-opacity buffers. """
+        self.record(parameter_values_view(core, model, self.metadata),
+                    part_opacities_view(core, model, self.metadata), timestamp)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "ParameterRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class Recording:
+    """ A decoded recording: `frames` is (frame_count, parameter_count + part_count) float32. """
+    __slots__ = ("parameter_count", "part_count", "timestamps", "frames")
+
+    def __init__(self, parameter_count: int, part_count: int, timestamps: np.ndarray, frames: np.ndarray):
+        self.parameter_count = parameter_count
+        self.part_count = part_count
+        self.timestamps = timestamps
+        self.frames = frames
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @property
+    def parameter_values(self) -> np.ndarray:
+        return self.frames[:, :self.parameter_count]
+
+    @property
+    def part_opacities(self) -> np.ndarray:
+        return self.frames[:, self.parameter_count:]
+
+
+def read_recording(path) -> Recording:
+    """
+    Decodes a recording file. A truncated trailing frame (e.g. from a crashed writer) is ignored;
+    `ParameterRecorder` cuts such a tail off before appending to the file.
+    Files appended to by several sessions restart their timestamps at each session's first keyframe.
+    """
+    data = Path(path).read_bytes()
+    parameter_count, part_count = _read_header(data, path)
+    width = parameter_count + part_count
+    timestamps: List[float] = []
+    frames: List[np.ndarray] = []
+    current = np.zeros(width, dtype="<u4")
+    for kind, timestamp, count, offset, _ in _scan_frames(data, width, path):
+        if kind == _KEYFRAME:
+            current = np.frombuffer(data, dtype="<u4", count=count, offset=offset).copy()
+        elif kind == _DENSE_DELTA:
+            current = current ^ np.frombuffer(data, dtype="<u4", count=count, offset=offset)
+        else:
+            indices = np.frombuffer(data, dtype="<u4", count=count, offset=offset)
+            if count and indices.max() >= width:
+                raise ValueError(f"{path}: corrupt frame at byte {offset - _FRAME_HEADER.size}")
+            current = current.copy()
+            current[indices] ^= np.frombuffer(data, dtype="<u4", count=count, offset=offset + 4 * count)
+        timestamps.append(timestamp)
+        frames.append(current)
+    stacked = np.stack(frames).view("<f4").astype(np.float32) if frames else np.empty((0, width), dtype=np.float32)
+    return Recording(parameter_count, part_count, np.asarray(timestamps, dtype=np.float64), stacked)
+
+
+class ReplayReport:
+    """ Throughput and per-update latency of a replay run. """
+    __slots__ = ("models", "updates", "elapsed", "latencies")
+
+    def __init__(self, models: int, updates: int, elapsed: float, latencies: np.ndarray):
+        self.models = models
+        self.updates = updates
+        self.elapsed = elapsed
+        self.latencies = latencies  # 秒
+
+    @property
+    def updates_per_second(self) -> float:
+        return self.updates / self.elapsed if self.elapsed > 0 else 0.0
+
+    def percentile(self, q: float) -> float:
+        """ Latency percentile in seconds. """
+        return float(np.percentile(self.latencies, q)) if len(self.latencies) else 0.0
+
+    def __str__(self) -> str:
+        p50, p90, p99 = (self.percentile(q) * 1e6 for q in (50, 90, 99))
+        worst = float(self.latencies.max()) * 1e6 if len(self.latencies) else 0.0
+        return (f"ReplayReport(models={self.models}, updates={self.updates}, elapsed={self.elapsed:.3f}s, "
+                f"throughput={self.updates_per_second:.1f}/s, p50={p50:.1f}us, p90={p90:.1f}us, "
+                f"p99={p99:.1f}us, max={worst:.1f}us)")
+
+
+def replay(core: Live2DCubismCore, models: Sequence[csmModelPtr], recordings: Sequence[Recording],
+           metadata: MocMetadata, loops: int = 1) -> ReplayReport:
+    """
+    Drives `models` from `recordings` as fast as possible, ignoring the recorded timestamps.
+    Model `i` plays `recordings[i % len(recordings)]`; models take turns frame by frame.
+    Latency covers writing one frame into the model's buffers plus `csmUpdateModel`.
+    """
+    if not models or not recordings:
+        raise ValueError("replay needs at least one model and one recording")
+    for recording in recordings:
+        if (recording.parameter_count, recording.part_count) != (metadata.parameter_count, metadata.part_count):
+            raise ValueError("recording does not match the moc")
+    parameter_count = metadata.parameter_count
+    parameters = [parameter_values_view(core, model, metadata) for model in models]
+    opacities = [part_opacities_view(core, model, metadata) for model in models]
+    sources = [recordings[i % len(recordings)].frames for i in range(len(models))]
+    frame_count = max(len(frames) for frames in sources)
+    update = core.csmUpdateModel
+
+    latencies = np.empty(loops * sum(len(frames) for frames in sources), dtype=np.int64)
+    n = 0
+    clock = time.perf_counter_ns
+    start = clock()
+    for _ in range(loops):
+        for frame_index in range(frame_count):
+            for i, model in enumerate(models):
+                frames = sources[i]
+                if frame_index >= len(frames):
+                    continue
+                frame = frames[frame_index]
+                t0 = clock()
+                parameters[i][:] = frame[:parameter_count]
+                opacities[i][:] = frame[parameter_count:]
+                update(model)
+                latencies[n] = clock() - t0
+                n += 1
+    elapsed = (clock() - start) / 1e9
+    return ReplayReport(len(models), n, elapsed, latencies[:n] / 1e9)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    from .l2dLoader import load_moc, new_model
+    from .l2dMeta import get_moc_metadata
+
+    parser = argparse.ArgumentParser(prog="python -m PyL2D.l2dRecord", description="Replay parameter recordings against a moc.")
+    parser.add_argument("moc", help="path of the .moc3 file")
+    parser.add_argument("recordings", nargs="+", help="recording files")
+    parser.add_argument("-n", "--models", type=int, default=1, help="number of model instances to drive")
+    parser.add_argument("--loops", type=int, default=1, help="times to play each recording")
+    parser.add_argument("--dll", default=None, help="path of the Live2DCubismCore library")
+    args = parser.parse_args(argv)
+
+    core = Live2DCubismCore(args.dll)
+    moc = load_moc(core, args.moc)
+    handles = [new_model(core, moc) for _ in range(args.models)]
+    metadata = get_moc_metadata(core, moc, handles[0].model)
+    recordings = [read_recording(path) for path in args.recordings]
+    report = replay(core, [h.model for h in handles], recordings, metadata, args.loops)
+    print(report)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,51 @@
+""" PyL2D 导入耗时基准：在全新的子进程中反复 `import PyL2D`，统计耗时并检查没有提前加载重依赖。 """
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+
+# 子进程中执行：分别计时解释器基线与 import PyL2D，并报告 NumPy 是否被加载、dll 是否被加载。
+PROBE = r"""
+import sys, time
+t0 = time.perf_counter()
+import PyL2D
+t1 = time.perf_counter()
+core = PyL2D.Live2DCubismCore()
+t2 = time.perf_counter()
+from PyL2D import l2d
+print(t1 - t0, t2 - t1, int('numpy' in sys.modules), len(l2d._libraries))
+"""
+
+def run_once() -> tuple:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(out[0]), float(out[1]), bool(int(out[2])), int(out[3])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--runs", type=int, default=20, help="number of fresh interpreter runs")
+    args = parser.parse_args()
+
+    imports, constructs = [], []
+    numpy_loaded = dll_loaded = False
+    for _ in range(args.runs):
+        t_import, t_construct, has_numpy, libraries = run_once()
+        imports.append(t_import)
+        constructs.append(t_construct)
+        numpy_loaded |= has_numpy
+        dll_loaded |= libraries > 0
+
+    print(f"runs:                       {args.runs}")
+    print(f"import PyL2D   median/min:  {statistics.median(imports) * 1e3:.2f} / {min(imports) * 1e3:.2f} ms")
+    print(f"Live2DCubismCore() median:  {statistics.median(constructs) * 1e6:.1f} us")
+    print(f"numpy imported eagerly:     {numpy_loaded}")
+    print(f"dll loaded eagerly:         {dll_loaded}")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,17 @@
 from PyL2D.l2d import Live2DCubismCore
 from PyL2D.l2dData import csmVector2
+from PyL2D.l2dLog import install_log_sink
 
 import ctypes
+import logging
+
+logging.basicConfig(level=logging.INFO, format="Log: %(message)s")
 
 # 实例化 DLL 包装器
 l2d = Live2DCubismCore()
 
-# my log
-def log_function(message: str):
-    print(f"Log: {message.decode('utf-8')}")
-
-l2d.csmSetLogFunction(ctypes.WINFUNCTYPE(None, ctypes.c_char_p)(log_function))
+# core 日志写入环形缓冲区，由后台线程转发到 logging
+log_sink = install_log_sink(l2d)
 
 # 加载 moc3 文件到内存中
 with open(r'F:\python_play\Live2d\Live2DPythonBound\符玄\符玄.moc3', 'rb') as f:
@@ -66,4 +67,6 @@ for i in range(count):
 size_in_pixels = csmVector2()
 origin_in_pixels = csmVector2()
 info = l2d.csmReadCanvasInfo(model, size_in_pixels, origin_in_pixels, ctypes.c_float(1.0))
-print(f"画布大小为 {size_in_pixels.x} x {size_in_pixels.y} 像素")
\ No newline at end of file
+print(f"画布大小为 {size_in_pixels.x} x {size_in_pixels.y} 像素")
+
+log_sink.stop()
\ No newline at end of file
@@ -0,0 +1,43 @@
+""" 测试公用夹具：不依赖dll，直接用数组构造 MocMetadata。 """
+
+import numpy as np
+import pytest
+
+from PyL2D.l2dMeta import MocMetadata, _ARRAY_FIELDS, _offsets, _pack_ids
+
+
+def build_metadata(parameter_ids=(), part_ids=(), minimum=0.0, maximum=1.0, drawables=()) -> MocMetadata:
+    """
+    - minimum / maximum: Parameter range, scalar or per parameter.
+    - drawables: [(id, masks, uvs, indices), ...]; empty lists give empty ragged entries.
+    """
+    arrays = {name: np.zeros(0, dtype=dtype) for name, dtype in _ARRAY_FIELDS}
+    p, k, d = len(parameter_ids), len(part_ids), len(drawables)
+    arrays["parameter_id_blob"], arrays["parameter_id_offsets"] = _pack_ids([i.encode() for i in parameter_ids], p)
+    arrays["parameter_types"] = np.zeros(p)
+    arrays["parameter_minimum_values"] = np.broadcast_to(np.float32(minimum), (p,))
+    arrays["parameter_maximum_values"] = np.broadcast_to(np.float32(maximum), (p,))
+    arrays["parameter_default_values"] = np.zeros(p)
+    arrays["parameter_key_counts"] = np.zeros(p)
+    arrays["parameter_key_offsets"] = np.zeros(p + 1)
+    arrays["part_id_blob"], arrays["part_id_offsets"] = _pack_ids([i.encode() for i in part_ids], k)
+    arrays["part_parent_part_indices"] = np.full(k, -1)
+
+    arrays["drawable_id_blob"], arrays["drawable_id_offsets"] = _pack_ids([e[0].encode() for e in drawables], d)
+    arrays["drawable_constant_flags"] = np.zeros(d)
+    arrays["drawable_texture_indices"] = np.zeros(d)
+    arrays["drawable_parent_part_indices"] = np.full(d, -1)
+    for name, column, shape in (("mask", 1, (-1,)), ("vertex", 2, (-1, 2)), ("index", 3, (-1,))):
+        items = [np.asarray(e[column]).reshape(shape) for e in drawables]
+        counts = np.array([len(item) for item in items], dtype=np.int32)
+        arrays[f"drawable_{name}_counts"] = counts
+        arrays[f"drawable_{name}_offsets"] = _offsets(counts)
+    arrays["drawable_masks"] = np.concatenate([np.asarray(e[1]) for e in drawables] or [np.zeros(0)])
+    arrays["drawable_vertex_uvs"] = np.concatenate([np.asarray(e[2]).reshape(-1, 2) for e in drawables] or [np.zeros((0, 2))])
+    arrays["drawable_indices"] = np.concatenate([np.asarray(e[3]) for e in drawables] or [np.zeros(0)])
+    return MocMetadata(arrays)
+
+
+@pytest.fixture
+def make_metadata():
+    return build_metadata
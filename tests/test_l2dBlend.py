@@ -0,0 +1,192 @@
+""" CompiledPose / ExpressionBlender 与逐组、逐表情的参考实现对比，不需要dll。 """
+
+import numpy as np
+import pytest
+
+from PyL2D.l2dBlend import (
+    CompiledExpression,
+    CompiledPose,
+    ExpressionBlender,
+    POSE_BACK_OPACITY_THRESHOLD,
+    POSE_EPSILON,
+    POSE_PHI,
+)
+
+
+def reference_do_fade(groups, links, parameter_values, part_opacities, delta_time, fade_time):
+    """ groups: [[(part_index, parameter_index), ...], ...]; links: [(source, target), ...]. """
+    opacities = part_opacities.astype(np.float64)
+    for group in groups:
+        shown = -1
+        new_opacity = 1.0
+        for i, (part, parameter) in enumerate(group):
+            if parameter >= 0 and parameter_values[parameter] > POSE_EPSILON:
+                if shown >= 0:
+                    break
+                shown = i
+                new_opacity = opacities[part]
+                new_opacity += delta_time / fade_time if fade_time > 0.0 else 1.0
+                new_opacity = min(new_opacity, 1.0)
+        if shown < 0:
+            shown = 0
+            new_opacity = 1.0
+        for i, (part, _) in enumerate(group):
+            if i == shown:
+                opacities[part] = new_opacity
+                continue
+            if new_opacity < POSE_PHI:
+                a1 = new_opacity * (POSE_PHI - 1.0) / POSE_PHI + 1.0
+            else:
+                a1 = (1.0 - new_opacity) * POSE_PHI / (1.0 - POSE_PHI)
+            if (1.0 - a1) * (1.0 - new_opacity) > POSE_BACK_OPACITY_THRESHOLD:
+                a1 = 1.0 - POSE_BACK_OPACITY_THRESHOLD / (1.0 - new_opacity)
+            opacities[part] = min(opacities[part], a1)
+    for source, target in links:
+        opacities[target] = opacities[source]
+    return opacities
+
+
+POSE = {
+    "Groups": [
+        [{"Id": "P1", "Link": ["P3"]}, {"Id": "P2", "Link": []}],
+        [{"Id": "P4", "Link": []}, {"Id": "P5", "Link": []}, {"Id": "P6", "Link": []}],
+    ]
+}
+PART_IDS = ["P1", "P2", "P3", "P4", "P5", "P6"]
+
+
+def test_pose_without_visible_parameter_snaps_to_first_part(make_metadata):
+    metadata = make_metadata(["P1", "P2"], ["P1", "P2", "P3"])
+    pose = CompiledPose.compile({"Groups": POSE["Groups"][:1]}, metadata)
+    parameters = np.zeros(2, dtype=np.float32)
+    opacities = np.array([0.0, 1.0, 0.0], dtype=np.float32)
+    pose.apply(parameters, opacities, 0.1)
+    np.testing.assert_allclose(opacities, [1.0, 0.0, 1.0])
+
+
+@pytest.mark.parametrize("fade_time", [0.0, 0.5])
+def test_pose_matches_reference(make_metadata, fade_time):
+    rng = np.random.default_rng(1)
+    parameter_ids = ["P1", "P2", "P4", "P5", "P6"]
+    metadata = make_metadata(parameter_ids, PART_IDS)
+    pose = CompiledPose.compile(dict(POSE, FadeInTime=fade_time), metadata)
+    groups = [[(metadata.index_of("part", e["Id"]), metadata.index_of("parameter", e["Id"])) for e in g]
+              for g in POSE["Groups"]]
+    links = [(0, 2)]
+    for _ in range(50):
+        parameters = (rng.random(len(parameter_ids)) > 0.6).astype(np.float32)
+        opacities = rng.random(len(PART_IDS)).astype(np.float32)
+        expected = reference_do_fade(groups, links, parameters, opacities, 0.1, fade_time)
+        pose.apply(parameters, opacities, 0.1)
+        np.testing.assert_allclose(opacities, expected, rtol=1e-6, atol=1e-6)
+
+
+def ease_sine(t):
+    return 0.5 - 0.5 * np.cos(np.clip(t, 0.0, 1.0) * np.pi)
+
+
+def reference_expressions(active, parameter_values, minimum, maximum):
+    """ active: [(entries, weight), ...] in activation order; entries: [(index, value, blend), ...]. """
+    values = parameter_values.astype(np.float64)
+    touched = sorted({index for entries, _ in active for index, _, _ in entries})
+    for index in touched:
+        additive, multiply, overwrite = 0.0, 1.0, values[index]
+        for entries, weight in active:
+            for i, value, blend in entries:
+                if i != index:
+                    continue
+                if blend == "Add":
+                    additive += value * weight
+                elif blend == "Multiply":
+                    multiply *= 1.0 + (value - 1.0) * weight
+                else:
+                    overwrite = overwrite * (1.0 - weight) + value * weight
+        values[index] = min(max((overwrite + additive) * multiply, minimum), maximum)
+    return values
+
+
+EXPRESSIONS = {
+    "smile": {"FadeInTime": 0.5, "FadeOutTime": 0.4, "Parameters": [
+        {"Id": "P0", "Value": 0.8, "Blend": "Overwrite"},
+        {"Id": "P1", "Value": 0.3},
+        {"Id": "P2", "Value": 1.5, "Blend": "Multiply"},
+        {"Id": "Missing", "Value": 9.0},
+    ]},
+    "angry": {"FadeInTime": 0.2, "FadeOutTime": 0.2, "Parameters": [
+        {"Id": "P0", "Value": -0.5, "Blend": "Overwrite"},
+        {"Id": "P1", "Value": 0.5, "Blend": "Multiply"},
+        {"Id": "P3", "Value": 2.5, "Blend": "Add"},
+    ]},
+    "blink": {"FadeInTime": 0.0, "FadeOutTime": 0.3, "Parameters": [
+        {"Id": "P0", "Value": 0.1, "Blend": "Overwrite"},
+        {"Id": "P2", "Value": 0.2, "Blend": "Add"},
+        {"Id": "P3", "Value": 0.0, "Blend": "Overwrite"},
+    ]},
+}
+
+
+def test_expressions_match_reference(make_metadata):
+    parameter_ids = ["P0", "P1", "P2", "P3", "P4"]
+    metadata = make_metadata(parameter_ids, [], minimum=-1.0, maximum=2.0)
+    compiled = {name: CompiledExpression.compile(data, metadata, name) for name, data in EXPRESSIONS.items()}
+    blender = ExpressionBlender(metadata)
+    # (名称 -> [已激活时间, 淡出已用时间或 None])，独立于 blender 计算权重
+    state = {}
+
+    def activate(name):
+        blender.activate(compiled[name])
+        state[name] = [0.0, None]
+
+    def deactivate(name):
+        blender.deactivate(compiled[name])
+        state[name][1] = 0.0
+
+    def step(delta_time):
+        blender.update(delta_time)
+        for name in list(state):
+            state[name][0] += delta_time
+            if state[name][1] is not None:
+                state[name][1] += delta_time
+                if state[name][1] >= EXPRESSIONS[name]["FadeOutTime"]:
+                    del state[name]
+
+    def check():
+        active = []
+        for name, (elapsed, fading_out) in state.items():
+            data = EXPRESSIONS[name]
+            weight = ease_sine(elapsed / data["FadeInTime"]) if data["FadeInTime"] > 0 else 1.0
+            if fading_out is not None:
+                weight *= 1.0 - ease_sine(fading_out / data["FadeOutTime"])
+            entries = [(parameter_ids.index(p["Id"]), p["Value"], p.get("Blend", "Add"))
+                       for p in data["Parameters"] if p["Id"] in parameter_ids]
+            active.append((entries, weight))
+        assert [e.name for e in blender.active] == list(state)
+        values = rng.uniform(-1.0, 2.0, len(parameter_ids)).astype(np.float32)
+        expected = reference_expressions(active, values, -1.0, 2.0)
+        blender.apply(values)
+        np.testing.assert_allclose(values, expected, rtol=1e-5, atol=1e-6)
+
+    rng = np.random.default_rng(2)
+    activate("smile")
+    check()
+    for _ in range(3):
+        step(0.1)
+        check()
+    activate("angry")
+    activate("blink")
+    for _ in range(4):
+        step(0.1)
+        check()
+    deactivate("angry")
+    for _ in range(3):
+        step(0.1)
+        check()
+    assert "angry" not in state
+    blender.activate(compiled["angry"], exclusive=True)
+    for name in ("smile", "blink"):
+        state[name][1] = 0.0
+    state["angry"] = [0.0, None]
+    for _ in range(5):
+        step(0.1)
+        check()
+    assert list(state) == ["angry"]
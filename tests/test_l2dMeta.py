@@ -0,0 +1,71 @@
+""" MocMetadata 的 save()/load() 往返与按 moc 句柄缓存，不需要dll。 """
+
+import types
+
+import numpy as np
+import pytest
+
+from PyL2D import l2dMeta
+from PyL2D.l2dLoader import MocHandle
+from PyL2D.l2dMeta import MocMetadata, _ARRAY_NAMES, get_moc_metadata
+
+DRAWABLES = [
+    ("D0", [1, 2], [[0.0, 0.1], [0.2, 0.3], [0.4, 0.5]], [0, 1, 2]),
+    ("D1", [], [], []),
+    ("D2", [0], [[1.0, 1.0]], [0, 0, 0]),
+]
+
+
+@pytest.mark.parametrize("drawables", [DRAWABLES, [("Empty", [], [], [])], []])
+def test_save_load_round_trip(make_metadata, tmp_path, drawables):
+    metadata = make_metadata(["ParamA", "ParamB"], ["PartA"], minimum=-1.0, maximum=2.0, drawables=drawables)
+    path = tmp_path / "meta.bin"
+    metadata.save(path)
+    loaded = MocMetadata.load(path)
+
+    for name in _ARRAY_NAMES:
+        expected, actual = getattr(metadata, name), getattr(loaded, name)
+        assert actual.dtype == expected.dtype, name
+        assert actual.shape == expected.shape, name
+        np.testing.assert_array_equal(actual, expected, err_msg=name)
+        assert not actual.flags.writeable, name
+        assert actual.ctypes.data % l2dMeta._ALIGN == 0 or actual.size == 0, name
+    assert loaded.drawable_vertex_uvs.shape[1:] == (2,)
+    assert loaded.parameter_ids == ("ParamA", "ParamB")
+    assert loaded.drawable_ids == tuple(d[0] for d in drawables)
+    for i, (_, masks, uvs, indices) in enumerate(drawables):
+        np.testing.assert_array_equal(loaded.drawable_mask(i), masks)
+        np.testing.assert_array_equal(loaded.drawable_uvs(i), np.asarray(uvs, dtype=np.float32).reshape(-1, 2))
+        np.testing.assert_array_equal(loaded.drawable_index_list(i), indices)
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"NOTMETA!" + bytes(16))
+    with pytest.raises(ValueError):
+        MocMetadata.load(path)
+
+
+def test_metadata_is_immutable(make_metadata):
+    metadata = make_metadata(["ParamA"], ["PartA"])
+    with pytest.raises(AttributeError):
+        metadata.parameter_types = np.zeros(1)
+    with pytest.raises(ValueError):
+        metadata.parameter_types[0] = 1
+
+
+def test_get_moc_metadata_is_cached_per_handle(make_metadata, monkeypatch):
+    extracted = []
+
+    def from_model(core, model):
+        extracted.append(model)
+        return make_metadata([model], [])
+
+    monkeypatch.setattr(MocMetadata, "from_model", staticmethod(from_model))
+    core = types.SimpleNamespace()
+    moc_a = MocHandle(np.zeros(64, dtype=np.uint8), None)
+    moc_b = MocHandle(np.zeros(64, dtype=np.uint8), None)
+    first = get_moc_metadata(core, moc_a, "A")
+    assert get_moc_metadata(core, moc_a, "A2") is first
+    assert get_moc_metadata(core, moc_b, "B").parameter_ids == ("B",)
+    assert extracted == ["A", "B"]
@@ -0,0 +1,167 @@
+""" 录制文件格式往返：关键帧、稀疏/稠密差分帧、残帧与损坏帧，不需要dll。 """
+
+import struct
+import types
+
+import numpy as np
+import pytest
+
+from PyL2D import l2dRecord
+from PyL2D.l2dRecord import (
+    ParameterRecorder,
+    _DELTA,
+    _DENSE_DELTA,
+    _FILE_HEADER,
+    _FRAME_HEADER,
+    _KEYFRAME,
+    _scan_frames,
+    read_recording,
+    replay,
+)
+
+PARAMETERS = 8
+PARTS = 2
+
+
+@pytest.fixture
+def metadata(make_metadata):
+    return make_metadata([f"P{i}" for i in range(PARAMETERS)], [f"Part{i}" for i in range(PARTS)])
+
+
+def make_frames(count=12, seed=0):
+    """ 交替出现完全变化（稠密差分）与少量变化（稀疏差分）的帧，包含 -0.0、NaN 与极小值。 """
+    rng = np.random.default_rng(seed)
+    frames = [rng.standard_normal(PARAMETERS + PARTS).astype(np.float32)]
+    frames[0][:3] = [-0.0, np.nan, 1e-45]
+    for i in range(1, count):
+        if i % 2:
+            frame = frames[-1].copy()
+            frame[rng.integers(0, len(frame))] = rng.standard_normal()
+        else:
+            frame = rng.standard_normal(PARAMETERS + PARTS).astype(np.float32)
+        frames.append(frame)
+    return frames
+
+
+def write(path, metadata, frames, keyframe_interval=5):
+    with ParameterRecorder(path, metadata, keyframe_interval=keyframe_interval) as recorder:
+        for i, frame in enumerate(frames):
+            recorder.record(frame[:PARAMETERS], frame[PARAMETERS:], timestamp=i * 0.01)
+
+
+def frame_kinds(path):
+    return [kind for kind, *_ in _scan_frames(path.read_bytes(), PARAMETERS + PARTS, path)]
+
+
+def assert_bits_equal(actual, expected):
+    np.testing.assert_array_equal(actual.view("<u4"), np.stack(expected).astype("<f4").view("<u4"))
+
+
+def test_round_trip_is_lossless(tmp_path, metadata):
+    path = tmp_path / "a.rec"
+    frames = make_frames()
+    write(path, metadata, frames)
+    kinds = frame_kinds(path)
+    assert {_KEYFRAME, _DELTA, _DENSE_DELTA} <= set(kinds)
+    assert kinds[::5] == [_KEYFRAME] * len(kinds[::5])
+
+    recording = read_recording(path)
+    assert len(recording) == len(frames)
+    assert_bits_equal(recording.frames, frames)
+    np.testing.assert_allclose(recording.timestamps, np.arange(len(frames)) * 0.01)
+    assert recording.parameter_values.shape == (len(frames), PARAMETERS)
+    assert recording.part_opacities.shape == (len(frames), PARTS)
+
+
+def test_truncated_tail_is_ignored(tmp_path, metadata):
+    path = tmp_path / "a.rec"
+    frames = make_frames()
+    write(path, metadata, frames)
+    data = path.read_bytes()
+    path.write_bytes(data[:-3])
+    assert_bits_equal(read_recording(path).frames, frames[:-1])
+    path.write_bytes(data + bytes(_FRAME_HEADER.size - 1))
+    assert_bits_equal(read_recording(path).frames, frames)
+
+
+def test_append_after_truncated_tail(tmp_path, metadata):
+    path = tmp_path / "a.rec"
+    first, second = make_frames(7, seed=1), make_frames(4, seed=2)
+    write(path, metadata, first)
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02\x03")
+    write(path, metadata, second)
+    kinds = frame_kinds(path)
+    assert kinds[len(first)] == _KEYFRAME
+    assert_bits_equal(read_recording(path).frames, first + second)
+
+
+def test_recorder_rejects_wrong_widths_and_files(tmp_path, metadata, make_metadata):
+    path = tmp_path / "a.rec"
+    with ParameterRecorder(path, metadata) as recorder:
+        with pytest.raises(ValueError):
+            recorder.record(np.zeros(PARAMETERS + 1), np.zeros(PARTS))
+        with pytest.raises(ValueError):
+            recorder.record(np.zeros(PARAMETERS), np.zeros(PARTS - 1))
+    assert read_recording(path).frames.shape == (0, PARAMETERS + PARTS)
+
+    with pytest.raises(ValueError):
+        ParameterRecorder(path, make_metadata(["Other"], []))
+    short = tmp_path / "short.rec"
+    short.write_bytes(b"L2DR")
+    with pytest.raises(ValueError):
+        ParameterRecorder(short, metadata)
+    with pytest.raises(ValueError):
+        read_recording(short)
+
+
+def corrupt_at(path, frame_index, mutate):
+    data = bytearray(path.read_bytes())
+    offset = [payload - _FRAME_HEADER.size for *_, payload, _ in _scan_frames(bytes(data), PARAMETERS + PARTS, path)][frame_index]
+    mutate(data, offset)
+    path.write_bytes(bytes(data))
+    return offset
+
+
+@pytest.mark.parametrize("case", ["keyframe_width", "dense_width", "sparse_index", "unknown_kind", "delta_first"])
+def test_corrupt_frames_raise(tmp_path, metadata, case):
+    path = tmp_path / "a.rec"
+    write(path, metadata, make_frames())
+    kinds = frame_kinds(path)
+    width = PARAMETERS + PARTS
+
+    def set_count(data, offset, value):
+        struct.pack_into("<I", data, offset + 9, value)
+
+    if case == "keyframe_width":
+        offset = corrupt_at(path, kinds.index(_KEYFRAME, 1), lambda d, o: set_count(d, o, width - 1))
+    elif case == "dense_width":
+        offset = corrupt_at(path, kinds.index(_DENSE_DELTA), lambda d, o: set_count(d, o, width + 1))
+    elif case == "sparse_index":
+        offset = corrupt_at(path, kinds.index(_DELTA),
+                            lambda d, o: struct.pack_into("<I", d, o + _FRAME_HEADER.size, width))
+    elif case == "unknown_kind":
+        offset = corrupt_at(path, 3, lambda d, o: d.__setitem__(o, 7))
+    else:
+        offset = corrupt_at(path, 0, lambda d, o: d.__setitem__(o, _DENSE_DELTA))
+    assert offset >= _FILE_HEADER.size
+    with pytest.raises(ValueError, match=f"corrupt frame at byte {offset}"):
+        read_recording(path)
+
+
+def test_replay_drives_every_model(tmp_path, metadata, monkeypatch):
+    path = tmp_path / "a.rec"
+    frames = make_frames(6)
+    write(path, metadata, frames)
+    recording = read_recording(path)
+    buffers = {m: (np.zeros(PARAMETERS, np.float32), np.zeros(PARTS, np.float32)) for m in range(3)}
+    monkeypatch.setattr(l2dRecord, "parameter_values_view", lambda core, model, meta: buffers[model][0])
+    monkeypatch.setattr(l2dRecord, "part_opacities_view", lambda core, model, meta: buffers[model][1])
+    updated = []
+    core = types.SimpleNamespace(csmUpdateModel=updated.append)
+
+    report = replay(core, [0, 1, 2], [recording], metadata, loops=2)
+    assert report.updates == len(updated) == 3 * 2 * len(frames)
+    assert report.percentile(50) <= report.percentile(99)
+    for parameters, opacities in buffers.values():
+        assert_bits_equal(np.concatenate((parameters, opacities))[None], frames[-1:])